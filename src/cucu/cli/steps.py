@@ -1,12 +1,79 @@
 import contextlib
+import hashlib
 import io
 import json
-import re
+import os
+from importlib import metadata
+
+from rapidfuzz.utils import default_process
 
 from cucu import behave_tweaks
 
+STEPS_CACHE_FILENAME = ".cucu-steps.json"
+
+
+def _steps_sources_fingerprint(filepath):
+    """
+    fingerprint the python sources under the features directory provided,
+    which are the only files that can change the set of available steps
+    between runs of the same cucu version. every file contributes its
+    path, mtime and size so a file being added, removed or touched always
+    changes the fingerprint, even when some newer file's mtime would mask
+    the change.
+    """
+    sources = []
+
+    for parent, _, filenames in os.walk(filepath):
+        for filename in filenames:
+            if filename.endswith(".py"):
+                source = os.path.join(parent, filename)
+                with contextlib.suppress(OSError):
+                    stat = os.stat(source)
+                    sources.append((source, stat.st_mtime_ns, stat.st_size))
+
+    sources.sort()
+
+    return hashlib.sha256(str(sources).encode("utf8")).hexdigest()
+
+
+def _read_steps_cache_file(filepath):
+    """
+    return the steps cache persisted by a previous load_cucu_steps call if
+    it is still valid for the current cucu version and step sources,
+    otherwise None.
+    """
+    try:
+        with open(STEPS_CACHE_FILENAME, encoding="utf8") as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get("version") != metadata.version("cucu"):
+        return None
+
+    if cached.get("fingerprint") != _steps_sources_fingerprint(filepath):
+        return None
+
+    return cached.get("steps")
 
-def load_cucu_steps(filepath=None):
+
+def _write_steps_cache_file(filepath, steps_cache):
+    """
+    persist the steps cache so subsequent loads can skip the behave
+    dry-run, failures to write are ignored since the cache is best effort.
+    """
+    cached = {
+        "version": metadata.version("cucu"),
+        "fingerprint": _steps_sources_fingerprint(filepath),
+        "steps": steps_cache,
+    }
+
+    with contextlib.suppress(OSError):
+        with open(STEPS_CACHE_FILENAME, "w", encoding="utf8") as cache_file:
+            json.dump(cached, cache_file)
+
+
+def load_cucu_steps(filepath=None, use_cache=False):
     """
     loads the cucu steps definition using behave and returns an array of
     hashmaps that have the following structure:
@@ -16,19 +83,36 @@ def load_cucu_steps(filepath=None):
                 "location": {
                     "filepath": "...",
                     "line": "...",
-                }
+                },
+                "_norm": "...",
             }
         }
 
+    the `_norm` value is the step name normalized once with rapidfuzz's
+    default_process so fuzzy matching doesn't have to re-normalize every
+    step name on every lookup.
+
     undefined steps are marked with a value of None instead of a location. ie:
 
         {
             [undefined_step_name]: None
         }
 
+    when use_cache is True the steps are persisted to .cucu-steps.json and
+    reloaded from there, skipping the behave dry-run entirely, for as long
+    as the cucu version and the step sources on disk are unchanged.
+
     Returns:
         an array of hashmaps
     """
+    steps_dir = filepath if filepath is not None else "features"
+
+    if use_cache:
+        cached_steps = _read_steps_cache_file(steps_dir)
+
+        if cached_steps is not None:
+            return (cached_steps, None)
+
     steps_cache = {}
     args = ["--dry-run", "--no-summary", "--format", "steps.doc"]
 
@@ -48,8 +132,10 @@ def load_cucu_steps(filepath=None):
     stderr = stderr.getvalue()
 
     if stdout.startswith("USING RUNNER:"):
-        # remove the first line of the output so that linter won't error out trying to parse it as a step
-        stdout = "\n".join(stdout.split("\n")[1:])
+        # remove the first line of the output so that linter won't error out
+        # trying to parse it as a step, slicing at the first newline avoids
+        # the split/join round trip over the whole steps listing
+        stdout = stdout[stdout.find("\n") + 1 :]
 
     if stdout.startswith("ParserError"):
         print(stdout)
@@ -93,25 +179,39 @@ def load_cucu_steps(filepath=None):
         step_name = lines[0]
         location = lines[2]
 
-        step_name = re.match(r"\('(.*)'\)", step_name).groups()[0]
+        step_name = step_name.strip().removeprefix("('").removesuffix("')")
         _, filepath, line_number = location.split(":")
 
         steps_cache[step_name] = {
             "location": {
                 "filepath": filepath.strip(),
                 "line": line_number.strip(),
-            }
+            },
+            "_norm": default_process(step_name),
         }
 
     # collect any undefined steps
     for line in stderr.split("\n"):
         # @when(u'I close the current browser caca')
-        match = re.match(r"@[a-z]+\(u'([^']+)'\)", line)
-        if match:
-            step_name = match.group(1)
+        if not line.startswith("@"):
+            continue
+
+        keyword, found, rest = line.partition("(u'")
+
+        keyword = keyword[1:]
+
+        if not found or not (keyword.isalpha() and keyword.islower()):
+            continue
+
+        step_name, found, _ = rest.partition("'")
+
+        if found and step_name:
             steps_cache[step_name] = None
 
     if error == 0:
+        if use_cache:
+            _write_steps_cache_file(steps_dir, steps_cache)
+
         return (steps_cache, None)
 
     else:
@@ -123,7 +223,23 @@ def print_json_steps(filepath=None):
     pretty print the steps in a JSON fart
     """
     steps, steps_error = load_cucu_steps(filepath=filepath)
-    print(json.dumps(steps, indent=2, sort_keys=True))
+
+    # strip the cache-internal underscore fields so they don't leak into
+    # the CLI's JSON output
+    printable_steps = {
+        step_name: (
+            {
+                key: value
+                for key, value in details.items()
+                if not key.startswith("_")
+            }
+            if details is not None
+            else None
+        )
+        for step_name, details in steps.items()
+    }
+
+    print(json.dumps(printable_steps, indent=2, sort_keys=True))
 
 
 def print_human_readable_steps(filepath=None):
@@ -433,6 +433,12 @@ CONFIG.define(
     "comma separated list of paths to load cucu lint rules from .yaml files",
     default="",
 )
+CONFIG.define(
+    "CUCU_REPORT_HARDLINK",
+    "when set to 'true' report generation clones the results artifacts "
+    "into the report with hard links where possible instead of copying them",
+    default=True,
+)
 CONFIG.define(
     "CUCU_JUNIT_WITH_STACKTRACE",
     "when set to 'true' results in stacktraces showing in the JUnit XML failure output",
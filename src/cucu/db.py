@@ -5,9 +5,11 @@ Database creation and management utilities for cucu.
 import logging
 import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import orjson
 from peewee import (
     BooleanField,
     DateTimeField,
@@ -17,7 +19,8 @@ from peewee import (
     Model,
     TextField,
 )
-from playhouse.sqlite_ext import JSONField, SqliteExtDatabase
+from playhouse.sqlite_ext import JSONField as BaseJSONField
+from playhouse.sqlite_ext import SqliteExtDatabase
 from tenacity import RetryError
 
 from cucu.config import CONFIG
@@ -29,6 +32,19 @@ logger = logging.getLogger("peewee")
 logger.setLevel(logging.WARNING)  # Only show warnings and errors
 
 
+class JSONField(BaseJSONField):
+    """
+    JSON column that deserializes with orjson, report generation reads
+    several JSON columns for every recorded step so the faster parser
+    makes a real difference on large runs. writing stays on the stdlib
+    encoder which accepts a wider range of python types.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("json_loads", orjson.loads)
+        super().__init__(*args, **kwargs)
+
+
 class BaseModel(Model):
     class Meta:
         database = db
@@ -411,6 +427,25 @@ def get_first_cucu_run_filepath():
     return run_record.filepath
 
 
+def read_database_file(db_file, tables_to_copy):
+    """
+    read every row of the tables provided out of the database file, using
+    a connection of its own so multiple files can be read in parallel
+    threads.
+    """
+    tables = []
+    with sqlite3.connect(db_file) as source_conn:
+        source_cursor = source_conn.cursor()
+        for table_name in tables_to_copy:
+            source_cursor.execute(f"SELECT * FROM {table_name}")
+            rows = source_cursor.fetchall()
+            source_cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = [col[1] for col in source_cursor.fetchall()]
+            tables.append((table_name, columns, rows))
+
+    return tables
+
+
 def consolidate_database_files(results_dir):
     # This function would need a more advanced approach with peewee, so for now, keep using sqlite3 for consolidation
     results_path = Path(results_dir)
@@ -422,23 +457,28 @@ def consolidate_database_files(results_dir):
         db for db in results_path.glob("**/*.db") if db.name != "run.db"
     ]
     tables_to_copy = ["cucu_run", "worker", "feature", "scenario", "step"]
+    #
+    # reading each worker's database is the expensive half of the merge,
+    # so read them all in parallel threads while the single connection to
+    # the target database applies the inserts as each read completes
+    #
     with sqlite3.connect(target_db_path) as target_conn:
         target_cursor = target_conn.cursor()
-        for db_file in db_files:
-            with sqlite3.connect(db_file) as source_conn:
-                source_cursor = source_conn.cursor()
-                for table_name in tables_to_copy:
-                    source_cursor.execute(f"SELECT * FROM {table_name}")
-                    rows = source_cursor.fetchall()
-                    source_cursor.execute(f"PRAGMA table_info({table_name})")
-                    columns = [col[1] for col in source_cursor.fetchall()]
+        with ThreadPoolExecutor() as executor:
+            file_tables = executor.map(
+                lambda db_file: read_database_file(db_file, tables_to_copy),
+                db_files,
+            )
+
+            for db_file, tables in zip(db_files, file_tables):
+                for table_name, columns, rows in tables:
                     placeholders = ",".join(["?" for _ in columns])
                     target_cursor.executemany(
                         f"INSERT OR REPLACE INTO {table_name} VALUES ({placeholders})",
                         rows,
                     )
                     target_conn.commit()
-            db_file.unlink()
+                db_file.unlink()
 
 
 def init_html_report_db(db_path):
@@ -141,12 +141,16 @@ class CucuFormatter(Formatter):
         indent = make_indentation(2 * self.indent_size)
         keyword = step.keyword.rjust(5)
 
+        # buffer the pieces of the step line so they hit the stream in a
+        # single write instead of one small write per piece
+        output = []
+
         if not (
             self.monochrome
             or step.has_substeps
             or CONFIG["__CUCU_WROTE_TO_OUTPUT"]
         ):
-            self.stream.write(up(1))
+            output.append(up(1))
 
         prefix = ""
         if step.is_substep:
@@ -177,9 +181,9 @@ class CucuFormatter(Formatter):
             )
 
         if self.monochrome:
-            self.stream.write(f"{text}")
+            output.append(f"{text}")
         else:
-            self.stream.write(f"\r{text}")
+            output.append(f"\r{text}")
 
         if step.status in (Status.passed, Status.failed):
             max_line_length = self.calculate_max_line_length()
@@ -196,9 +200,11 @@ class CucuFormatter(Formatter):
             status_text = f"{' ' * status_text_padding}{status_text}"
             status_text = self.colorize(status_text, "yellow")
 
-            self.stream.write(f"{status_text}\n")
+            output.append(f"{status_text}\n")
             if step.error_message:
-                self.stream.write(f"{step.error_message}\n")
+                output.append(f"{step.error_message}\n")
+
+        self.stream.write("".join(output))
 
         if step.text:
             self.doc_string(step.text)
@@ -239,8 +245,8 @@ class CucuFormatter(Formatter):
                 variable_line = CONFIG.hide_secrets(variable_line)
                 colored_variable_line = self.colorize(variable_line, "blue")
                 self.stream.write(colored_variable_line)
-                self.stream.flush()
 
+        self.stream.flush()
         self.previous_step = step
         CONFIG["__CUCU_WROTE_TO_OUTPUT"] = False
 
@@ -2,7 +2,7 @@ import logging
 import re
 from importlib import metadata
 
-import jellyfish
+import numpy
 from lsprotocol.types import (
     TEXT_DOCUMENT_COMPLETION,
     CompletionItem,
@@ -11,12 +11,79 @@ from lsprotocol.types import (
     CompletionParams,
 )
 from pygls.server import LanguageServer
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 from cucu import init_global_hook_variables
 from cucu.cli.steps import load_cucu_steps
 
 init_global_hook_variables()
 
+# compiled once instead of on every completion request
+STEP_LINE_REGEX = re.compile("(Given|When|Then|And) (.*)")
+
+# reserved key under which find_completions stashes the index it builds
+# for a steps cache, storing it on the cache itself ties the index's
+# lifetime to the cache instead of leaving entries behind in a module
+# level table keyed by dict ids that can be reused
+STEPS_CACHE_INDEX_KEY = "__cucu_steps_cache_index__"
+
+# editors re-request completions for the same fragment as the cursor
+# moves around so each steps cache index carries a memo of computed
+# completion lists, cleared once it hits the size cap to bound growth
+COMPLETIONS_MEMO_MAX_SIZE = 4096
+
+
+def _steps_cache_index(steps_cache):
+    """
+    return the completion index for the steps cache provided, building it
+    on first use. the index holds a character trie of the step names where
+    each node is a plain {char: child} dict with the full step name stored
+    under the None key at terminal nodes.
+    """
+    index = steps_cache.get(STEPS_CACHE_INDEX_KEY)
+
+    if index is None:
+        trie = {}
+
+        for step in steps_cache:
+            if step == STEPS_CACHE_INDEX_KEY:
+                continue
+
+            node = trie
+            for char in step:
+                node = node.setdefault(char, {})
+            node[None] = step
+
+        index = {"trie": trie, "memo": {}}
+        steps_cache[STEPS_CACHE_INDEX_KEY] = index
+
+    return index
+
+
+def _steps_with_prefix(trie, prefix):
+    """
+    yield every step name under the prefix provided, in sorted order.
+    """
+    node = trie
+
+    for char in prefix:
+        node = node.get(char)
+
+        if node is None:
+            return
+
+    stack = [node]
+    while stack:
+        node = stack.pop()
+
+        if None in node:
+            yield node[None]
+
+        chars = sorted((x for x in node if x is not None), reverse=True)
+        for char in chars:
+            stack.append(node[char])
+
 
 def find_completions(step_fragment, steps_cache=None):
     """
@@ -35,28 +102,65 @@ def find_completions(step_fragment, steps_cache=None):
     if steps_cache is None:
         steps_cache, _ = load_cucu_steps()
 
-    # first pass try to find steps that start with fragment provided
-    for step in steps_cache.keys():
-        if step.startswith(step_fragment):
+    index = _steps_cache_index(steps_cache)
+    memo = index["memo"]
+    memoized = memo.get(step_fragment)
+
+    if memoized is not None:
+        return memoized
+
+    # first pass try to find steps that start with fragment provided, the
+    # trie walk costs time proportional to the fragment length and the
+    # number of matches rather than the size of the whole step catalog
+    trie = index["trie"]
+
+    for step in _steps_with_prefix(trie, step_fragment):
+        step_details = steps_cache[step]
+        location = step_details["location"]
+        location = f"{location['filepath']}:{location['line']}"
+        items.append((step, location))
+
+    # if there were 0 steps found then lets at least find some that are close
+    # based on some string distance heuristic, process.cdist scores every
+    # step in one vectorized pass (workers=-1 spreads the scoring across
+    # all available cores) and scores below the cutoff are zeroed out
+    if len(items) == 0:
+        # compare against the normalized step names cached by
+        # load_cucu_steps so only the fragment needs normalizing here,
+        # undefined steps have no details so normalize those in place
+        steps = []
+        normalized_steps = []
+        for step, details in steps_cache.items():
+            if step == STEPS_CACHE_INDEX_KEY:
+                continue
+
+            steps.append(step)
+            normalized_steps.append(
+                details["_norm"] if details else default_process(step)
+            )
+        scores = process.cdist(
+            [default_process(step_fragment)],
+            normalized_steps,
+            scorer=fuzz.ratio,
+            processor=None,
+            score_cutoff=40,
+            workers=-1,
+        )[0]
+
+        for rank in numpy.argsort(-scores):
+            if not scores[rank]:
+                break
+
+            step = steps[rank]
             step_details = steps_cache[step]
             location = step_details["location"]
             location = f"{location['filepath']}:{location['line']}"
             items.append((step, location))
 
-    # if there were 0 steps found then lets at least find some that are close
-    # based on some string distance heuristic
-    if len(items) == 0:
-        for step in steps_cache.keys():
-            if jellyfish.jaro_similarity(step_fragment, step) > 0.6:
-                step_details = steps_cache[step]
-                location = step_details["location"]
-                location = f"{location['filepath']}:{location['line']}"
-                items.append((step, location))
-
-        def compare_completion_item(completion_item):
-            return jellyfish.jaro_similarity(completion_item[0], step_fragment)
+    if len(memo) >= COMPLETIONS_MEMO_MAX_SIZE:
+        memo.clear()
 
-        items.sort(key=compare_completion_item, reverse=True)
+    memo[step_fragment] = items
 
     return items
 
@@ -64,7 +168,7 @@ def find_completions(step_fragment, steps_cache=None):
 def start(port=None):
     version = metadata.version(__package__.split(".")[0])
     server = LanguageServer(name="cucu", version=version)
-    steps_cache, _ = load_cucu_steps()
+    steps_cache, _ = load_cucu_steps(use_cache=True)
     logging.basicConfig(
         filename="pygls.log", filemode="w", level=logging.DEBUG
     )
@@ -83,9 +187,7 @@ def start(port=None):
         logging.debug(f'completions for "{completion_line}"')
 
         completion_line = completion_line.lstrip()
-        step_line = re.match(
-            "(Given|When|Then|And) (.*)", completion_line
-        ).groups()[1]
+        step_line = STEP_LINE_REGEX.match(completion_line).groups()[1]
 
         items = []
         step_completions = find_completions(
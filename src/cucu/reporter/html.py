@@ -1,4 +1,3 @@
-import glob
 import os
 import shutil
 import sys
@@ -9,6 +8,7 @@ from pathlib import Path
 from xml.sax.saxutils import escape as escape_
 
 import jinja2
+from mpire import WorkerPool
 
 from cucu import format_gherkin_table, logger
 from cucu.ansi_parser import parse_log_to_html
@@ -19,6 +19,10 @@ from cucu.db import scenario as ScenarioModel
 from cucu.db import step as StepModel
 from cucu.utils import ellipsize_filename, get_step_image_dir
 
+# epoch used to render elapsed timedeltas as datetimes for the report
+# templates, replacing the deprecated datetime.utcfromtimestamp
+EPOCH = datetime(1970, 1, 1)
+
 
 def escape(data):
     if data is None:
@@ -37,11 +41,15 @@ def process_tags(element):
     if "tags" not in element:
         return
 
+    # the handlers are registered with their regexes already compiled, so
+    # snapshot them into a tuple once instead of rebuilding the items view
+    # for every tag
+    tag_handlers = tuple(CONFIG["__CUCU_HTML_REPORT_TAG_HANDLERS"].items())
+
     for tag in element["tags"]:
         tag = f"@{tag}"
 
         # process custom tag handlers
-        tag_handlers = CONFIG["__CUCU_HTML_REPORT_TAG_HANDLERS"].items()
         for regex, handler in tag_handlers:
             if regex.match(tag):
                 tag = handler(tag)
@@ -51,6 +59,34 @@ def process_tags(element):
     element["tags"] = " ".join(prepared_tags)
 
 
+def link_or_copy_file(src, dst):
+    """
+    hard link the file into place when the filesystem allows it, which
+    makes cloning the results artifacts into the report directory nearly
+    free, falling back to a real copy when linking isn't possible (e.g.
+    the source and destination live on different filesystems).
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def copytree_with_hardlinks(src, dst, dirs_exist_ok=False):
+    """
+    shutil.copytree that clones files with link_or_copy_file, or with a
+    plain copy when CUCU_REPORT_HARDLINK is disabled.
+    """
+    copy_function = shutil.copy2
+
+    if CONFIG.true("CUCU_REPORT_HARDLINK"):
+        copy_function = link_or_copy_file
+
+    shutil.copytree(
+        src, dst, copy_function=copy_function, dirs_exist_ok=dirs_exist_ok
+    )
+
+
 # function to left pad duration with '0' for better alphabetical sorting in html reports.
 def left_pad_zeroes(elapsed_time):
     int_decimal = str(round(elapsed_time, 3)).split(".")
@@ -59,6 +95,97 @@ def left_pad_zeroes(elapsed_time):
     return padded_duration
 
 
+def urlencode(string):
+    """
+    handles encoding specific characters in the names of features/scenarios
+    so they can be used in a URL. NOTICE: we're not handling spaces since
+    the browser handles those already.
+
+    """
+    return string.replace('"', "%22").replace("'", "%27").replace("#", "%23")
+
+
+def create_template_environment():
+    """
+    create the jinja2 template environment used to render the HTML report
+    pages, the report templates ship with cucu and never change at runtime
+    so auto reloading is off and the compiled templates are cached on disk
+    where every render worker process can reuse them. the bytecode cache
+    is left to pick its own per-user temporary directory so one user's
+    cache is never shared with, or writable by, another.
+    """
+    package_loader = jinja2.PackageLoader("cucu.reporter", "templates")
+    templates = jinja2.Environment(  # nosec
+        loader=package_loader,
+        auto_reload=False,
+        bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    )
+    templates.globals.update(escape=escape, urlencode=urlencode)
+
+    return templates
+
+
+def render_feature_page(basepath, results, feature):
+    """
+    render the feature page and every one of its scenario pages, used as
+    the unit of work when rendering features in parallel so each feature
+    renders in its own process.
+    """
+    templates = create_template_environment()
+    feature_basepath = os.path.join(basepath, feature["folder_name"])
+    os.makedirs(feature_basepath, exist_ok=True)
+
+    scenarios = feature.get("scenarios", [])
+
+    feature_template = templates.get_template("feature.html")
+    feature_output_filepath = os.path.join(basepath, f"{feature['name']}.html")
+
+    # stream each page straight to its file instead of materializing the
+    # whole render as one big string first
+    feature_template.stream(
+        feature=feature,
+        scenarios=scenarios,
+        dir_depth="",
+        title=feature.get("name", "Cucu results"),
+    ).dump(feature_output_filepath, encoding="utf8")
+
+    scenario_template = templates.get_template("scenario.html")
+
+    for scenario in scenarios:
+        steps = scenario["steps"]
+        scenario_basepath = os.path.join(
+            feature_basepath, scenario["folder_name"]
+        )
+        os.makedirs(scenario_basepath, exist_ok=True)
+
+        scenario_output_filepath = os.path.join(
+            scenario_basepath, "index.html"
+        )
+
+        scenario_template.stream(
+            basepath=results,
+            feature=feature,
+            path_exists=os.path.exists,
+            scenario=scenario,
+            steps=steps,
+            title=scenario.get("name", "Cucu results"),
+            dir_depth="../../",
+        ).dump(scenario_output_filepath, encoding="utf8")
+
+
+def convert_console_log_to_html(log_filepath):
+    """
+    convert a console log file into its HTML twin next to it on disk,
+    used as the unit of work when converting logs in parallel.
+    """
+    input_file = Path(log_filepath)
+    output_file = Path(log_filepath + ".html")
+    output_file.write_text(
+        parse_log_to_html(input_file.read_text(encoding="utf-8")),
+        encoding="utf-8",
+    )
+
+
 def generate(results, basepath, only_failures=False):
     """
     generate an HTML report for the results provided.
@@ -170,7 +297,7 @@ def generate(results, basepath, only_failures=False):
 
     cucu_dir = os.path.dirname(sys.modules["cucu"].__file__)
     external_dir = os.path.join(cucu_dir, "reporter", "external")
-    shutil.copytree(external_dir, os.path.join(basepath, "external"))
+    copytree_with_hardlinks(external_dir, os.path.join(basepath, "external"))
     shutil.copyfile(
         os.path.join(cucu_dir, "reporter", "favicon.png"),
         os.path.join(basepath, "favicon.png"),
@@ -184,6 +311,16 @@ def generate(results, basepath, only_failures=False):
     #
     CONFIG.snapshot()
     reported_features = []
+    grand_totals_keys = [
+        "total_scenarios",
+        "total_scenarios_passed",
+        "total_scenarios_failed",
+        "total_scenarios_skipped",
+        "total_scenarios_errored",
+        "duration",
+    ]
+    grand_totals = dict.fromkeys(grand_totals_keys, 0)
+    console_log_conversions = []
     for feature in features:
         feature["folder_name"] = ellipsize_filename(feature["name"])
         scenarios = []
@@ -191,10 +328,16 @@ def generate(results, basepath, only_failures=False):
         if feature["status"] != "untested" and "elements" in feature:
             scenarios = feature["elements"]
 
+        # derive the renderable scenario list exactly once per feature and
+        # carry it on the feature itself so the render workers don't have
+        # to rebuild it
+        feature["scenarios"] = scenarios
+
         if only_failures and feature["status"] != "failed":
             continue
 
         feature_duration = 0
+        feature_total_steps = 0
         total_scenarios = 0
         total_scenarios_passed = 0
         total_scenarios_failed = 0
@@ -213,7 +356,7 @@ def generate(results, basepath, only_failures=False):
             dst_feature_filepath = os.path.join(
                 basepath, feature["folder_name"]
             )
-            shutil.copytree(
+            copytree_with_hardlinks(
                 src_feature_filepath, dst_feature_filepath, dirs_exist_ok=True
             )
 
@@ -271,6 +414,17 @@ def generate(results, basepath, only_failures=False):
             elif scenario["status"] == "errored":
                 total_scenarios_errored += 1
 
+            # list the scenario directory once instead of checking
+            # os.path.exists for every single step's image directory
+            if os.path.isdir(scenario_filepath):
+                scenario_dirnames = {
+                    entry.name
+                    for entry in os.scandir(scenario_filepath)
+                    if entry.is_dir()
+                }
+            else:
+                scenario_dirnames = set()
+
             step_index = 0
             scenario_started_at = None
             for step in scenario["steps"]:
@@ -286,7 +440,7 @@ def generate(results, basepath, only_failures=False):
                         f"h{step['name'][:4].count('#') + 1}"
                     )
 
-                if os.path.exists(image_dirpath):
+                if image_dir in scenario_dirnames:
                     _, _, image_names = next(os.walk(image_dirpath))
                     images = []
                     for image_name in image_names:
@@ -324,12 +478,9 @@ def generate(results, basepath, only_failures=False):
                             if scenario_started_at is None:
                                 scenario_started_at = timestamp
                                 scenario["started_at"] = timestamp
-                            time_offset = datetime.utcfromtimestamp(
-                                (
-                                    timestamp - scenario_started_at
-                                ).total_seconds()
+                            step["result"]["time_offset"] = EPOCH + (
+                                timestamp - scenario_started_at
                             )
-                            step["result"]["time_offset"] = time_offset
                         else:
                             step["result"]["timestamp"] = ""
                             step["result"]["time_offset"] = ""
@@ -348,9 +499,11 @@ def generate(results, basepath, only_failures=False):
                 if "text" in step:
                     text_indent = "       "
                     step["text"] = "\n".join(
-                        [text_indent + '"""']
-                        + [f"{text_indent}{x}" for x in step["text"]]
-                        + [text_indent + '"""']
+                        (
+                            text_indent + '"""',
+                            *(f"{text_indent}{x}" for x in step["text"]),
+                            text_indent + '"""',
+                        )
                     )
 
                 # prepare by joining into one big chunk here since we can't do it in the Jinja template
@@ -362,22 +515,29 @@ def generate(results, basepath, only_failures=False):
                     )
 
                 step_index += 1
-            logs_dir = os.path.join(scenario_filepath, "logs")
 
-            if os.path.exists(logs_dir):
-                log_files = []
-                for log_file in glob.iglob(os.path.join(logs_dir, "*.*")):
-                    log_filepath = log_file.removeprefix(
-                        f"{scenario_filepath}/"
-                    )
+            log_files = []
+
+            # the scenario directory listing from above already tells us
+            # whether there are logs, and walking the directory directly
+            # gives us the file names without having to glob and then chop
+            # the scenario path back off of every match
+            if "logs" in scenario_dirnames:
+                logs_dir = Path(scenario_filepath, "logs")
+
+                for log_file in sorted(logs_dir.iterdir()):
+                    if "." not in log_file.name:
+                        continue
 
-                    if ".console." in log_filepath and scenario_started_at:
+                    log_filepath = f"logs/{log_file.name}"
+
+                    if ".console." in log_file.name and scenario_started_at:
                         log_filepath += ".html"
 
                     log_files.append(
                         {
                             "filepath": log_filepath,
-                            "name": os.path.basename(log_file),
+                            "name": log_file.name,
                         }
                     )
 
@@ -391,36 +551,30 @@ def generate(results, basepath, only_failures=False):
                     feature_started_at = scenario_started_at
                     feature["started_at"] = feature_started_at
 
-                scenario["time_offset"] = datetime.utcfromtimestamp(
-                    (scenario_started_at - feature_started_at).total_seconds()
+                scenario["time_offset"] = EPOCH + (
+                    scenario_started_at - feature_started_at
                 )
 
                 for log_file in [
                     x for x in log_files if ".console." in x["name"]
                 ]:
-                    log_file_filepath = os.path.join(
-                        scenario_filepath, "logs", log_file["name"]
-                    )
-
-                    input_file = Path(log_file_filepath)
-                    output_file = Path(log_file_filepath + ".html")
-                    output_file.write_text(
-                        parse_log_to_html(
-                            input_file.read_text(encoding="utf-8")
-                        ),
-                        encoding="utf-8",
+                    console_log_conversions.append(
+                        os.path.join(
+                            scenario_filepath, "logs", log_file["name"]
+                        )
                     )
 
             scenario["duration"] = left_pad_zeroes(scenario_duration)
-            feature_duration += scenario_duration
+            # accumulate the rounded per-scenario durations so the feature
+            # totals match what the scenario pages display
+            feature_duration += float(scenario["duration"])
+            feature_total_steps += scenario["total_steps"]
 
         if feature_started_at is None:
             feature["started_at"] = ""
 
-        feature["total_steps"] = sum([x["total_steps"] for x in scenarios])
-        feature["duration"] = left_pad_zeroes(
-            sum([float(x["duration"]) for x in scenarios])
-        )
+        feature["total_steps"] = feature_total_steps
+        feature["duration"] = left_pad_zeroes(feature_duration)
 
         feature["total_scenarios"] = total_scenarios
         feature["total_scenarios_passed"] = total_scenarios_passed
@@ -428,108 +582,62 @@ def generate(results, basepath, only_failures=False):
         feature["total_scenarios_skipped"] = total_scenarios_skipped
         feature["total_scenarios_errored"] = total_scenarios_errored
 
-    keys = [
-        "total_scenarios",
-        "total_scenarios_passed",
-        "total_scenarios_failed",
-        "total_scenarios_skipped",
-        "total_scenarios_errored",
-        "duration",
-    ]
-    grand_totals = {}
-    for k in keys:
-        grand_totals[k] = sum([float(x[k]) for x in reported_features])
-
-    package_loader = jinja2.PackageLoader("cucu.reporter", "templates")
-    templates = jinja2.Environment(loader=package_loader)  # nosec
+        for key in grand_totals_keys:
+            grand_totals[key] += float(feature[key])
 
-    def urlencode(string):
-        """
-        handles encoding specific characters in the names of features/scenarios
-        so they can be used in a URL. NOTICE: we're not handling spaces since
-        the browser handles those already.
+    #
+    # converting a console log to HTML is pure CPU-bound parsing that's
+    # independent per log file, so fan the collected conversions out over
+    # a process pool
+    #
+    if len(console_log_conversions) > 1:
+        n_jobs = min(len(console_log_conversions), os.cpu_count())
 
-        """
-        return (
-            string.replace('"', "%22").replace("'", "%27").replace("#", "%23")
-        )
+        with WorkerPool(n_jobs=n_jobs) as pool:
+            pool.map(convert_console_log_to_html, console_log_conversions)
+    elif console_log_conversions:
+        convert_console_log_to_html(console_log_conversions[0])
 
-    templates.globals.update(escape=escape, urlencode=urlencode)
+    templates = create_template_environment()
 
     index_template = templates.get_template("index.html")
-    rendered_index_html = index_template.render(
+    index_output_filepath = os.path.join(basepath, "index.html")
+    index_template.stream(
         features=reported_features,
         grand_totals=grand_totals,
         title="Cucu HTML Test Report",
         basepath=basepath,
         dir_depth="",
-    )
-
-    index_output_filepath = os.path.join(basepath, "index.html")
-    with open(index_output_filepath, "wb") as output:
-        output.write(rendered_index_html.encode("utf8"))
+    ).dump(index_output_filepath, encoding="utf8")
 
     flat_template = templates.get_template("flat.html")
-    rendered_flat_html = flat_template.render(
+    flat_output_filepath = os.path.join(basepath, "flat.html")
+    flat_template.stream(
         features=reported_features,
         grand_totals=grand_totals,
         title="Flat HTML Test Report",
         basepath=basepath,
         dir_depth="",
-    )
-
-    flat_output_filepath = os.path.join(basepath, "flat.html")
-    with open(flat_output_filepath, "wb") as output:
-        output.write(rendered_flat_html.encode("utf8"))
-
-    feature_template = templates.get_template("feature.html")
+    ).dump(flat_output_filepath, encoding="utf8")
 
-    for feature in reported_features:
-        feature_basepath = os.path.join(basepath, feature["folder_name"])
-        os.makedirs(feature_basepath, exist_ok=True)
-
-        scenarios = []
-        if feature["status"] != "untested" and "elements" in feature:
-            scenarios = feature["elements"]
-
-        rendered_feature_html = feature_template.render(
-            feature=feature,
-            scenarios=scenarios,
-            dir_depth="",
-            title=feature.get("name", "Cucu results"),
-        )
-
-        feature_output_filepath = os.path.join(
-            basepath, f"{feature['name']}.html"
-        )
-
-        with open(feature_output_filepath, "wb") as output:
-            output.write(rendered_feature_html.encode("utf8"))
-
-        scenario_template = templates.get_template("scenario.html")
-
-        for scenario in scenarios:
-            steps = scenario["steps"]
-            scenario_basepath = os.path.join(
-                feature_basepath, scenario["folder_name"]
-            )
-            os.makedirs(scenario_basepath, exist_ok=True)
-
-            scenario_output_filepath = os.path.join(
-                scenario_basepath, "index.html"
-            )
-
-            rendered_scenario_html = scenario_template.render(
-                basepath=results,
-                feature=feature,
-                path_exists=os.path.exists,
-                scenario=scenario,
-                steps=steps,
-                title=scenario.get("name", "Cucu results"),
-                dir_depth="../../",
+    #
+    # each feature page and its scenario pages render independently of the
+    # others, so spread them across a process pool when there's more than
+    # one feature to render
+    #
+    if len(reported_features) > 1:
+        n_jobs = min(len(reported_features), os.cpu_count())
+
+        with WorkerPool(n_jobs=n_jobs) as pool:
+            pool.map(
+                render_feature_page,
+                [
+                    (basepath, results, feature)
+                    for feature in reported_features
+                ],
             )
-
-            with open(scenario_output_filepath, "wb") as output:
-                output.write(rendered_scenario_html.encode("utf8"))
+    else:
+        for feature in reported_features:
+            render_feature_page(basepath, results, feature)
 
     return os.path.join(basepath, "flat.html")
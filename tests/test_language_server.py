@@ -1,3 +1,7 @@
+import os
+import tempfile
+
+from cucu.cli.steps import _read_steps_cache_file, _write_steps_cache_file
 from cucu.language_server.core import find_completions, load_cucu_steps
 
 
@@ -20,6 +24,74 @@ def test_find_completions_returns_something_when_prefix_does_not_match():
             )
 
 
+def test_steps_cache_file_round_trips_when_sources_are_unchanged():
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        try:
+            os.chdir(temp_dirpath)
+            steps_dir = os.path.join(temp_dirpath, "features", "steps")
+            os.makedirs(steps_dir)
+
+            with open(os.path.join(steps_dir, "my_steps.py"), "w") as output:
+                output.write("# step definitions\n")
+
+            steps_cache = {"I do a thing": None}
+            _write_steps_cache_file("features", steps_cache)
+
+            assert _read_steps_cache_file("features") == steps_cache
+        finally:
+            os.chdir(cwd)
+
+
+def test_steps_cache_file_invalidated_when_a_source_is_deleted():
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        try:
+            os.chdir(temp_dirpath)
+            steps_dir = os.path.join(temp_dirpath, "features", "steps")
+            os.makedirs(steps_dir)
+
+            with open(os.path.join(steps_dir, "my_steps.py"), "w") as output:
+                output.write("# step definitions\n")
+
+            with open(os.path.join(steps_dir, "more_steps.py"), "w") as output:
+                output.write("# more step definitions\n")
+
+            _write_steps_cache_file("features", {"I do a thing": None})
+
+            # deleting a source leaves every other file's mtime untouched
+            # but must still invalidate the cache
+            os.remove(os.path.join(steps_dir, "more_steps.py"))
+
+            assert _read_steps_cache_file("features") is None
+        finally:
+            os.chdir(cwd)
+
+
+def test_steps_cache_file_invalidated_when_a_source_is_added():
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        try:
+            os.chdir(temp_dirpath)
+            steps_dir = os.path.join(temp_dirpath, "features", "steps")
+            os.makedirs(steps_dir)
+
+            with open(os.path.join(steps_dir, "my_steps.py"), "w") as output:
+                output.write("# step definitions\n")
+
+            _write_steps_cache_file("features", {"I do a thing": None})
+
+            with open(os.path.join(steps_dir, "new_steps.py"), "w") as output:
+                output.write("# new step definitions\n")
+
+            assert _read_steps_cache_file("features") is None
+        finally:
+            os.chdir(cwd)
+
+
 def test_load_cucu_steps_returns_valid_list_of_existing_steps():
     steps, _ = load_cucu_steps()
 